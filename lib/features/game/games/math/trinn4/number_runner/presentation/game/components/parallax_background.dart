@@ -3,6 +3,7 @@ import 'dart:ui' as ui;
 import 'package:flame/components.dart';
 import 'package:flame/flame.dart';
 import 'package:flutter/painting.dart';
+import 'package:flutter/services.dart';
 
 /// Image-based parallax with six layers at different scroll speeds.
 class ParallaxBackground extends PositionComponent {
@@ -15,13 +16,43 @@ class ParallaxBackground extends PositionComponent {
     _LayerDef('number_runner/layers/Ground_02.png', 0.82),
   ];
 
+  /// Physical pixels per design pixel, used to pick the image variant.
+  final double pixelRatio;
+
   final List<_LoadedLayer> _layers = [];
   double _scroll = 0;
 
+  ParallaxBackground({this.pixelRatio = 1.0});
+
+  /// Returns the smallest of the [available] variant ratios that covers
+  /// [pixelRatio], or the largest one when none does. Mirrors the choice
+  /// precache_worker.js makes from `precache_manifest.json`.
+  static double variantRatio(double pixelRatio, Iterable<double> available) {
+    final ratios = available.toList()..sort();
+    if (ratios.isEmpty) return 1.0;
+    return ratios.firstWhere(
+      (ratio) => ratio >= pixelRatio,
+      orElse: () => ratios.last,
+    );
+  }
+
   @override
   Future<void> onLoad() async {
+    // Flame loads paths verbatim, so resolve the `N.0x/` variant from the
+    // asset manifest; only buckets the pipeline actually wrote are listed.
+    final manifest = await AssetManifest.loadFromAssetBundle(rootBundle);
+    final prefix = Flame.images.prefix;
     for (final def in _layerDefs) {
-      final image = await Flame.images.load(def.path);
+      final assets = manifest.getAssetVariants('$prefix${def.path}') ??
+          const <AssetMetadata>[];
+      final variants = <double, String>{
+        for (final asset in assets)
+          asset.targetDevicePixelRatio ?? 1.0: asset.key,
+      };
+      final key = variants[variantRatio(pixelRatio, variants.keys)];
+      final image = await Flame.images.load(
+        key == null ? def.path : key.substring(prefix.length),
+      );
       _layers.add(_LoadedLayer(image, def.speedFactor));
     }
   }
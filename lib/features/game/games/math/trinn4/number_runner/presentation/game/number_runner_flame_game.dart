@@ -1,3 +1,6 @@
+import 'dart:math' show min;
+import 'dart:ui' show PlatformDispatcher;
+
 import 'package:flame/components.dart';
 import 'package:flame/game.dart';
 
@@ -70,7 +73,16 @@ class NumberRunnerFlameGame extends FlameGame with HasCollisionDetection {
       height: resolution.y,
     );
 
-    _parallax = ParallaxBackground()
+    // The fixed-resolution camera letterboxes, so the drawn scale is the
+    // smaller of the two axis scales.
+    final view = PlatformDispatcher.instance.implicitView;
+    final viewScale = min(
+      canvasSize.x / _designWidth,
+      canvasSize.y / _designHeight,
+    );
+    _parallax = ParallaxBackground(
+      pixelRatio: viewScale * (view?.devicePixelRatio ?? 1),
+    )
       ..size = resolution
       ..position = Vector2.zero();
     camera.viewport.add(_parallax);
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import re
+import subprocess
 import sys
 from dataclasses import dataclass
 from pathlib import Path
@@ -11,6 +12,7 @@ SUBJECTS = ("reading", "math", "english", "science")
 
 FACTORIES_RELATIVE_PATH = Path("lib/features/game/bootstrap/game_factories.dart")
 MANIFEST_RELATIVE_PATH = Path("lib/features/game/bootstrap/game_manifest.dart")
+WEB_PRECACHE_TOOL_RELATIVE_PATH = Path("tool/build_web_precache.py")
 
 FACTORIES_IMPORTS_START = "// [MINIGAME_IMPORTS_START]"
 FACTORIES_IMPORTS_END = "// [MINIGAME_IMPORTS_END]"
@@ -542,6 +544,16 @@ def resolve_project_root(arg: Path | None) -> Path:
     return Path(__file__).resolve().parents[3]
 
 
+def regenerate_web_precache(project_root: Path) -> None:
+    tool_path = project_root / WEB_PRECACHE_TOOL_RELATIVE_PATH
+    if not tool_path.exists():
+        return
+    command = [sys.executable, str(tool_path), "--project-root", str(project_root)]
+    result = subprocess.run(command, check=False)
+    if result.returncode != 0:
+        raise ValueError(f"{relative_to_root(tool_path, project_root)} failed")
+
+
 def main() -> int:
     args = parse_args()
 
@@ -667,6 +679,11 @@ def main() -> int:
         if args.dry_run:
             for path in ordered_paths:
                 print(f"[dry-run] would write {relative_to_root(path, project_root)}")
+            if manifest_path in writes:
+                print(
+                    "[dry-run] would regenerate web precache manifest via "
+                    f"{WEB_PRECACHE_TOOL_RELATIVE_PATH.as_posix()}",
+                )
             return 0
 
         for path in ordered_paths:
@@ -674,6 +691,9 @@ def main() -> int:
             path.write_text(writes[path], encoding="utf-8", newline="\n")
             print(f"updated {relative_to_root(path, project_root)}")
 
+        if manifest_path in writes:
+            regenerate_web_precache(project_root)
+
         return 0
     except ValueError as error:
         print(f"error: {error}", file=sys.stderr)
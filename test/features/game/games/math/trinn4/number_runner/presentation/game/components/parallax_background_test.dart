@@ -0,0 +1,28 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:gradvis_v2/features/game/games/math/trinn4/number_runner/presentation/game/components/parallax_background.dart';
+
+void main() {
+  group('ParallaxBackground.variantRatio', () {
+    const available = [1.0, 2.0, 3.0];
+
+    test('uses the base image up to 1.0x', () {
+      expect(ParallaxBackground.variantRatio(0.5, available), 1.0);
+      expect(ParallaxBackground.variantRatio(1.0, available), 1.0);
+    });
+
+    test('picks the smallest variant that covers the pixel ratio', () {
+      expect(ParallaxBackground.variantRatio(1.5, available), 2.0);
+      expect(ParallaxBackground.variantRatio(2.0, available), 2.0);
+      expect(ParallaxBackground.variantRatio(2.5, available), 3.0);
+    });
+
+    test('falls back to the highest variant that exists', () {
+      expect(ParallaxBackground.variantRatio(2.5, [2.0, 1.0]), 2.0);
+      expect(ParallaxBackground.variantRatio(4.0, available), 3.0);
+    });
+
+    test('uses the base image when no variants are listed', () {
+      expect(ParallaxBackground.variantRatio(2.0, const []), 1.0);
+    });
+  });
+}
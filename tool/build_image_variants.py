@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""Generate Flutter resolution variants for minigame images.
+
+Full-resolution PNGs live under `assets_src/images/<game>/`. Each one is
+written to `assets/images/<game>/` as a 1.0x image sized for the game's
+design width (its `_designWidth` constant), plus `2.0x/` and `3.0x/`
+variants next to it. Variants are never upscaled: a bucket the source is
+too small to fill is not written, so the 1920px number_runner layers ship
+1.0x and 2.0x only and ParallaxBackground falls back to 2.0x. Outputs are
+re-encoded losslessly (metadata stripped, opaque alpha dropped, maximum
+zlib compression, no interlacing).
+
+Unchanged inputs are skipped using a content-hash cache committed at
+`assets_src/.image_variants_cache.json`. The cache also records which files
+the pipeline wrote, and only those are pruned when a source or bucket goes
+away. Requires Pillow.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from build_web_precache import GAMES_RELATIVE_PATH, parse_design_size
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - reported from main()
+    Image = None
+
+SOURCE_RELATIVE_PATH = Path("assets_src/images")
+OUTPUT_RELATIVE_PATH = Path("assets/images")
+CACHE_RELATIVE_PATH = Path("assets_src/.image_variants_cache.json")
+
+RATIOS = (1.0, 2.0, 3.0)
+# Bump when the encoding below changes so cached outputs are rebuilt.
+PIPELINE_VERSION = 3
+
+# Games whose images are drawn across a fixed-resolution canvas. The 1.0x
+# width is read from the game's `_designWidth`.
+IMAGE_GAMES = ("number_runner",)
+
+
+@dataclass(frozen=True)
+class VariantJob:
+    game: str
+    source_key: str
+    source_path: Path
+    output_paths: tuple[tuple[float, Path], ...]
+    logical_width: int
+    source_hash: str
+
+
+@dataclass(frozen=True)
+class VariantResult:
+    game: str
+    source_key: str
+    cache_key: str
+    source_bytes: int
+    variant_widths: dict[str, int]
+    variant_bytes: dict[str, int]
+    output_hashes: dict[str, str]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate 1.0x/2.0x/3.0x image variants for gradvis_v2 minigames.",
+    )
+    parser.add_argument("--project-root", type=Path, default=None)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    return parser.parse_args()
+
+
+def ratio_label(ratio: float) -> str:
+    return f"{ratio:.1f}x"
+
+
+def variant_path(output_root: Path, relative: Path, ratio: float) -> Path:
+    if ratio == 1.0:
+        return output_root / relative
+    return output_root / relative.parent / ratio_label(ratio) / relative.name
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def game_logical_width(project_root: Path, game: str) -> int:
+    for game_root in sorted((project_root / GAMES_RELATIVE_PATH).glob(f"*/*/{game}")):
+        size = parse_design_size(game_root)
+        if size is not None:
+            return round(size[0])
+    raise ValueError(f"No _designWidth declared for {game} under {GAMES_RELATIVE_PATH}")
+
+
+def cache_key(source_hash: str, logical_width: int) -> str:
+    # Settings are part of the key, so changing a logical width rebuilds.
+    return f"{source_hash}:{logical_width}:{PIPELINE_VERSION}"
+
+
+def encode_variant(image: "Image.Image", width: int, path: Path) -> None:
+    if width < image.width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    if image.mode == "RGBA" and image.getchannel("A").getextrema() == (255, 255):
+        image = image.convert("RGB")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path, format="PNG", optimize=True, compress_level=9)
+
+
+def run_job(job: VariantJob) -> VariantResult:
+    with Image.open(job.source_path) as opened:
+        opened.load()
+        image = opened.copy()
+    image.info.clear()
+
+    variant_widths: dict[str, int] = {}
+    variant_bytes: dict[str, int] = {}
+    output_hashes: dict[str, str] = {}
+    for ratio, path in job.output_paths:
+        width = round(job.logical_width * ratio)
+        if ratio != 1.0 and width > image.width:
+            # Upscaling adds bytes, not detail; the game uses a lower bucket.
+            continue
+        encode_variant(image, min(width, image.width), path)
+        variant_widths[ratio_label(ratio)] = width
+        variant_bytes[ratio_label(ratio)] = path.stat().st_size
+        output_hashes[ratio_label(ratio)] = file_hash(path)
+
+    return VariantResult(
+        game=job.game,
+        source_key=job.source_key,
+        cache_key=cache_key(job.source_hash, job.logical_width),
+        source_bytes=job.source_path.stat().st_size,
+        variant_widths=variant_widths,
+        variant_bytes=variant_bytes,
+        output_hashes=output_hashes,
+    )
+
+
+def load_cache(path: Path) -> dict[str, dict[str, object]]:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+
+def is_cached(job: VariantJob, entry: dict[str, object] | None) -> bool:
+    if entry is None or entry.get("cache_key") != cache_key(job.source_hash, job.logical_width):
+        return False
+    output_hashes = entry.get("output_hashes", {})
+    if ratio_label(1.0) not in output_hashes:
+        return False
+    for ratio, path in job.output_paths:
+        expected = output_hashes.get(ratio_label(ratio))
+        if expected is not None and (not path.exists() or file_hash(path) != expected):
+            return False
+    return True
+
+
+def collect_jobs(project_root: Path) -> list[VariantJob]:
+    jobs: list[VariantJob] = []
+    for game in IMAGE_GAMES:
+        logical_width = game_logical_width(project_root, game)
+        source_root = project_root / SOURCE_RELATIVE_PATH / game
+        output_root = project_root / OUTPUT_RELATIVE_PATH / game
+        if not source_root.is_dir():
+            raise ValueError(f"Missing source directory: {source_root}")
+        for source_path in sorted(source_root.rglob("*.png")):
+            relative = source_path.relative_to(source_root)
+            jobs.append(
+                VariantJob(
+                    game=game,
+                    source_key=source_path.relative_to(project_root).as_posix(),
+                    source_path=source_path,
+                    output_paths=tuple(
+                        (ratio, variant_path(output_root, relative, ratio)) for ratio in RATIOS
+                    ),
+                    logical_width=logical_width,
+                    source_hash=file_hash(source_path),
+                ),
+            )
+    return jobs
+
+
+def format_bytes(size: int) -> str:
+    return f"{size / 1024:,.0f} KiB"
+
+
+def print_report(results: list[VariantResult]) -> None:
+    for game in IMAGE_GAMES:
+        game_results = [result for result in results if result.game == game]
+        if not game_results:
+            continue
+        source_total = sum(result.source_bytes for result in game_results)
+        shipped_total = 0
+        parts = []
+        for ratio in RATIOS:
+            label = ratio_label(ratio)
+            built = [result for result in game_results if label in result.variant_bytes]
+            if not built:
+                parts.append(f"{label} skipped (source too small)")
+                continue
+            total = sum(result.variant_bytes[label] for result in built)
+            shipped_total += total
+            sources = sum(result.source_bytes for result in built)
+            saved = sources - total
+            note = f", {len(built)}/{len(game_results)} images" if built != game_results else ""
+            parts.append(
+                f"{label} {format_bytes(total)} (saved {format_bytes(saved)}, "
+                f"{saved * 100 / sources:.0f}%{note})",
+            )
+        print(f"{game}: source {format_bytes(source_total)} -> " + ", ".join(parts))
+        # Native builds bundle every bucket, so the shipped size can grow.
+        delta = shipped_total - source_total
+        print(
+            f"{game}: shipped {format_bytes(shipped_total)} "
+            f"({'+' if delta >= 0 else '-'}{format_bytes(abs(delta))} vs source)",
+        )
+
+
+def cached_outputs(project_root: Path, source_key: str, entry: dict[str, object]) -> list[Path]:
+    """Return the files a cache entry records as written for [source_key]."""
+    game, *parts = Path(source_key).relative_to(SOURCE_RELATIVE_PATH).parts
+    output_root = project_root / OUTPUT_RELATIVE_PATH / game
+    relative = Path(*parts)
+    return [
+        variant_path(output_root, relative, float(label[:-1]))
+        for label in dict(entry.get("output_hashes", {}))
+    ]
+
+
+def stale_outputs(
+    project_root: Path,
+    previous: dict[str, dict[str, object]],
+    current: dict[str, dict[str, object]],
+) -> list[Path]:
+    """Return files recorded in [previous] that [current] no longer lists.
+
+    Only paths the pipeline wrote are candidates, so files placed under
+    `assets/images/` by hand are never touched.
+    """
+    def outputs(cache: dict[str, dict[str, object]]) -> set[Path]:
+        return {
+            path
+            for source_key, entry in cache.items()
+            for path in cached_outputs(project_root, source_key, entry)
+        }
+
+    return sorted(path for path in outputs(previous) - outputs(current) if path.exists())
+
+
+def prune_outputs(project_root: Path, stale: list[Path]) -> None:
+    for path in stale:
+        path.unlink()
+        print(f"removed {path.relative_to(project_root).as_posix()}")
+        if path.parent.name in {ratio_label(ratio) for ratio in RATIOS}:
+            if not any(path.parent.iterdir()):
+                path.parent.rmdir()
+
+
+def resolve_project_root(arg: Path | None) -> Path:
+    if arg is not None:
+        return arg.resolve()
+    return Path(__file__).resolve().parents[1]
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        if Image is None:
+            raise ValueError("Pillow is required: pip install pillow")
+        if args.jobs is not None and args.jobs < 1:
+            raise ValueError("--jobs must be >= 1")
+
+        project_root = resolve_project_root(args.project_root)
+        cache_path = project_root / CACHE_RELATIVE_PATH
+        cache = load_cache(cache_path)
+        jobs = collect_jobs(project_root)
+
+        pending = [
+            job for job in jobs if args.force or not is_cached(job, cache.get(job.source_key))
+        ]
+        if args.dry_run:
+            # Buckets dropped by a rebuild are only known after encoding, so
+            # the preview covers outputs of deleted sources.
+            kept = {job.source_key for job in jobs}
+            stale = stale_outputs(
+                project_root,
+                cache,
+                {key: entry for key, entry in cache.items() if key in kept},
+            )
+            for job in pending:
+                print(f"[dry-run] would build variants for {job.source_key}")
+            for path in stale:
+                print(f"[dry-run] would remove {path.relative_to(project_root).as_posix()}")
+            print(f"{len(jobs) - len(pending)} unchanged, {len(pending)} to build")
+            return 0
+
+        results: list[VariantResult] = []
+        failures: list[str] = []
+        if pending:
+            workers = min(args.jobs or os.cpu_count() or 1, len(pending))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(run_job, job): job for job in pending}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        result = future.result()
+                    except (OSError, ValueError, Image.DecompressionBombError) as error:
+                        # UnidentifiedImageError is an OSError.
+                        failures.append(f"{job.source_key}: {error}")
+                        continue
+                    print(f"updated {result.source_key}")
+                    results.append(result)
+
+        pending_keys = {job.source_key for job in pending}
+        failed_keys = pending_keys - {result.source_key for result in results}
+        for job in jobs:
+            if job.source_key in pending_keys:
+                continue
+            entry = cache[job.source_key]
+            results.append(
+                VariantResult(
+                    game=job.game,
+                    source_key=job.source_key,
+                    cache_key=str(entry["cache_key"]),
+                    source_bytes=int(entry["source_bytes"]),
+                    variant_widths=dict(entry["variant_widths"]),
+                    variant_bytes=dict(entry["variant_bytes"]),
+                    output_hashes=dict(entry["output_hashes"]),
+                ),
+            )
+
+        new_cache = {
+            result.source_key: {
+                "cache_key": result.cache_key,
+                "source_bytes": result.source_bytes,
+                "variant_widths": result.variant_widths,
+                "variant_bytes": result.variant_bytes,
+                "output_hashes": result.output_hashes,
+            }
+            for result in results
+        }
+        # A failed source keeps its old outputs, and its stale cache key
+        # makes the next run retry it.
+        new_cache.update({key: cache[key] for key in failed_keys if key in cache})
+        new_cache = dict(sorted(new_cache.items()))
+        prune_outputs(project_root, stale_outputs(project_root, cache, new_cache))
+
+        content = json.dumps(new_cache, indent=2) + "\n"
+        if not cache_path.exists() or cache_path.read_text(encoding="utf-8") != content:
+            cache_path.write_text(content, encoding="utf-8", newline="\n")
+
+        built = len(pending) - len(failures)
+        print(f"{len(jobs) - len(pending)} unchanged, {built} built, {len(failures)} failed")
+        print_report(results)
+        if failures:
+            # Successful jobs stay cached; only the failed sources rebuild.
+            raise ValueError("could not process " + "; ".join(sorted(failures)))
+        return 0
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
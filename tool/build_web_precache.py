@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""Generate the prioritized precache manifest consumed by the web bootstrap.
+
+Reads the built-in game manifest, the curriculum structure, and the asset
+references of each minigame, then writes `web/precache_manifest.json` with
+three tiers: `shell` (compiled app, fonts and first-frame images), `trinn`
+(assets per trinn, fetched first for the trinn of the local profiles), and
+`background` (remaining home assets such as music, then everything else
+declared in pubspec.yaml). A `variants` map lists the `N.0x` resolutions of
+each image, with the design canvas of the game that draws it (parsed from
+its `_designWidth`/`_designHeight`), so the worker precaches only the
+resolution the viewport needs without repeating the game's constants.
+
+Run after changing assets or the game manifest; `add_minigame.py` runs it
+automatically when it registers a game. Every entry carries a per-file
+revision so the worker only re-downloads files that changed. Pass
+`--build-dir build/web` after `flutter build web` to list the shell from the
+actual build output, with revisions, and write the manifest there.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+FACTORIES_RELATIVE_PATH = Path("lib/features/game/bootstrap/game_factories.dart")
+MANIFEST_RELATIVE_PATH = Path("lib/features/game/bootstrap/game_manifest.dart")
+CURRICULUM_RELATIVE_PATH = Path("lib/core/constants/curriculum_data.dart")
+GAMES_RELATIVE_PATH = Path("lib/features/game/games")
+OUTPUT_RELATIVE_PATH = Path("web/precache_manifest.json")
+
+# Files emitted by `flutter build web` that every visit needs before the
+# first frame, used when no `--build-dir` is given. Asset bundles are
+# served under an extra `assets/` prefix.
+SHELL_BUILD_FILES = (
+    "index.html",
+    "flutter_bootstrap.js",
+    "main.dart.js",
+    "manifest.json",
+    "favicon.png",
+    "assets/AssetManifest.bin.json",
+    "assets/FontManifest.json",
+    "assets/NOTICES",
+    "assets/shaders/ink_sparkle.frag",
+)
+MATERIAL_ICONS_BUILD_FILE = "assets/fonts/MaterialIcons-Regular.otf"
+# Build output left to the worker's runtime cache rather than the shell:
+# canvaskit/ ships several renderer variants and a page loads only one.
+RUNTIME_BUILD_PREFIXES = ("canvaskit/",)
+WORKER_BUILD_FILES = ("precache_worker.js", OUTPUT_RELATIVE_PATH.name, ".last_build_id")
+WEB_ASSET_URL_PREFIX = "assets/"
+
+ASSET_LITERAL_PATTERN = re.compile(
+    r"""['"]([^'"\n]+\.(?:png|jpe?g|webp|gif|mp3|ogg|wav|json|ttf|otf))['"]""",
+)
+# Home assets allowed in the install-time shell tier: fonts and first-frame images.
+SHELL_ASSET_EXTENSIONS = (".ttf", ".otf", ".png", ".jpg", ".jpeg", ".webp", ".gif")
+RESOLUTION_VARIANT_PATTERN = re.compile(r"\d+(?:\.\d+)?x")
+# Fixed-resolution Flame games declare their canvas with these constants.
+DESIGN_SIZE_PATTERN = re.compile(
+    r"static\s+const\s+double\s+_design(Width|Height)\s*=\s*([\d.]+)\s*;",
+)
+# Flame.images, FlameAudio and audioplayers' AssetSource resolve relative
+# keys against these prefixes, in this order.
+ASSET_KEY_PREFIXES = ("", "assets/images/", "assets/audio/", "assets/")
+
+
+@dataclass(frozen=True)
+class GameEntry:
+    game_id: str
+    subject: str
+    trinn: int
+    level: int
+    factory_key: str
+    enabled: bool
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate the prioritized web precache manifest for gradvis_v2.",
+    )
+    parser.add_argument("--project-root", type=Path, default=None)
+    parser.add_argument("--build-dir", type=Path, default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    return parser.parse_args()
+
+
+def parse_game_manifest(content: str) -> list[GameEntry]:
+    entries: list[GameEntry] = []
+    current: dict[str, object] | None = None
+
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if "GameManifestEntry(" in line:
+            current = {}
+            continue
+        if current is None:
+            continue
+
+        id_match = re.search(r"id:\s*'([^']+)'", line)
+        if id_match:
+            current["game_id"] = id_match.group(1)
+
+        slot_match = re.search(
+            r"Subject\.(\w+),\s*trinn:\s*(\d+),\s*level:\s*(\d+)",
+            line,
+        )
+        if slot_match:
+            current["subject"] = slot_match.group(1)
+            current["trinn"] = int(slot_match.group(2))
+            current["level"] = int(slot_match.group(3))
+
+        factory_match = re.search(r"factoryKey:\s*'([^']+)'", line)
+        if factory_match:
+            current["factory_key"] = factory_match.group(1)
+
+        enabled_match = re.search(r"enabled:\s*(true|false)", line)
+        if enabled_match:
+            current["enabled"] = enabled_match.group(1) == "true"
+
+        if line == "),":
+            required = {"game_id", "subject", "trinn", "level", "factory_key"}
+            if required.issubset(current.keys()):
+                entries.append(
+                    GameEntry(
+                        game_id=str(current["game_id"]),
+                        subject=str(current["subject"]),
+                        trinn=int(current["trinn"]),
+                        level=int(current["level"]),
+                        factory_key=str(current["factory_key"]),
+                        enabled=bool(current.get("enabled", True)),
+                    ),
+                )
+            current = None
+
+    return entries
+
+
+def parse_curriculum_levels(content: str) -> dict[tuple[str, int], int]:
+    """Return the number of level nodes per (subject, trinn)."""
+    levels: dict[tuple[str, int], int] = {}
+    subject: str | None = None
+    trinn: int | None = None
+
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        subject_match = re.match(r"Subject\.(\w+):\s*\{", line)
+        if subject_match:
+            subject = subject_match.group(1)
+            trinn = None
+            continue
+        trinn_match = re.match(r"(\d+):\s*\[", line)
+        if trinn_match and subject is not None:
+            trinn = int(trinn_match.group(1))
+            levels[(subject, trinn)] = 0
+            continue
+        if line.startswith("LevelNode(") and subject is not None and trinn is not None:
+            levels[(subject, trinn)] += 1
+
+    return levels
+
+
+def parse_pubspec_assets(content: str) -> list[str]:
+    """Return `flutter: assets:` entries and font files declared in pubspec.yaml."""
+    assets: list[str] = []
+    in_flutter = False
+    in_assets = False
+    assets_indent = 0
+
+    for raw_line in content.splitlines():
+        if not raw_line.strip() or raw_line.lstrip().startswith("#"):
+            continue
+        indent = len(raw_line) - len(raw_line.lstrip())
+        line = raw_line.strip()
+        if indent == 0:
+            in_flutter = line == "flutter:"
+            in_assets = False
+            continue
+        if not in_flutter:
+            continue
+        if line == "assets:":
+            in_assets = True
+            assets_indent = indent
+            continue
+        if in_assets and indent <= assets_indent:
+            in_assets = False
+        if in_assets and line.startswith("- "):
+            assets.append(line[2:].strip().strip("'\""))
+            continue
+        font_match = re.match(r"-?\s*asset:\s*(\S+)", line)
+        if font_match:
+            assets.append(font_match.group(1).strip("'\""))
+
+    return assets
+
+
+def expand_declared_assets(project_root: Path, declared: list[str]) -> list[str]:
+    # Flutter includes the direct children of a declared asset directory,
+    # plus their resolution variants in `<ratio>x/` subdirectories.
+    expanded: list[str] = []
+    for entry in declared:
+        path = project_root / entry
+        if entry.endswith("/") and path.is_dir():
+            children = sorted(child for child in path.iterdir() if child.is_file())
+            variants = sorted(
+                variant
+                for variant_dir in path.iterdir()
+                if variant_dir.is_dir() and RESOLUTION_VARIANT_PATTERN.fullmatch(variant_dir.name)
+                for variant in variant_dir.iterdir()
+                if (path / variant.name) in children
+            )
+            expanded.extend(
+                child.relative_to(project_root).as_posix() for child in children + variants
+            )
+        elif path.is_file():
+            expanded.append(entry)
+    return expanded
+
+
+def resolve_asset_key(project_root: Path, literal: str) -> str | None:
+    for prefix in ASSET_KEY_PREFIXES:
+        if prefix and literal.startswith("assets/"):
+            break
+        candidate = f"{prefix}{literal}"
+        if candidate.startswith("assets/") and (project_root / candidate).is_file():
+            return candidate
+    return None
+
+
+def resolution_variants(project_root: Path, key: str) -> list[str]:
+    """Return the existing `<ratio>x/` variants of [key], which share its tier."""
+    path = project_root / key
+    if not path.parent.is_dir():
+        return []
+    return sorted(
+        (variant_dir / path.name).relative_to(project_root).as_posix()
+        for variant_dir in path.parent.iterdir()
+        if variant_dir.is_dir()
+        and RESOLUTION_VARIANT_PATTERN.fullmatch(variant_dir.name)
+        and (variant_dir / path.name).is_file()
+    )
+
+
+def parse_design_size(game_root: Path) -> tuple[float, float] | None:
+    """Return the `_designWidth`/`_designHeight` canvas declared in a game folder."""
+    size: dict[str, float] = {}
+    for dart_file in sorted(game_root.rglob("*.dart")):
+        for axis, value in DESIGN_SIZE_PATTERN.findall(dart_file.read_text(encoding="utf-8")):
+            size.setdefault(axis, float(value))
+    if {"Width", "Height"} <= size.keys():
+        return size["Width"], size["Height"]
+    return None
+
+
+def variant_ratio(key: str) -> float:
+    """Return the resolution ratio of an asset key; unprefixed keys are 1.0x."""
+    parent = Path(key).parent.name
+    return float(parent[:-1]) if RESOLUTION_VARIANT_PATTERN.fullmatch(parent) else 1.0
+
+
+def collect_asset_references(project_root: Path, dart_files: list[Path]) -> list[str]:
+    keys: list[str] = []
+    for dart_file in dart_files:
+        content = dart_file.read_text(encoding="utf-8")
+        for match in ASSET_LITERAL_PATTERN.finditer(content):
+            key = resolve_asset_key(project_root, match.group(1))
+            if key is None:
+                print(
+                    f"warning: unresolved asset '{match.group(1)}' in "
+                    f"{dart_file.relative_to(project_root).as_posix()}",
+                    file=sys.stderr,
+                )
+                continue
+            for variant_key in [key, *resolution_variants(project_root, key)]:
+                if variant_key not in keys:
+                    keys.append(variant_key)
+    return keys
+
+
+def parse_factory_game_roots(factories_path: Path) -> dict[str, Path]:
+    """Map factory keys to the game folder that defines the built widget class."""
+    content = factories_path.read_text(encoding="utf-8")
+    const_values = dict(
+        re.findall(
+            r"^\s*const\s+([A-Za-z0-9_]+)\s*=\s*'([^']+)';\s*$",
+            content,
+            flags=re.MULTILINE,
+        ),
+    )
+    class_files: dict[str, Path] = {}
+    for import_path in re.findall(r"^import\s+'(\.\./games/[^']+)';", content, flags=re.MULTILINE):
+        game_file = (factories_path.parent / import_path).resolve()
+        if not game_file.exists():
+            continue
+        game_content = game_file.read_text(encoding="utf-8")
+        for class_name in re.findall(r"^class\s+(\w+)", game_content, flags=re.MULTILINE):
+            class_files[class_name] = game_file
+
+    roots: dict[str, Path] = {}
+    for const_name, class_name in re.findall(
+        r"^\s*([A-Za-z0-9_]+):\s*\(\{required onComplete\}\)\s*=>\s*(\w+)\(",
+        content,
+        flags=re.MULTILINE,
+    ):
+        factory_key = const_values.get(const_name)
+        game_file = class_files.get(class_name)
+        if factory_key is not None and game_file is not None:
+            # <game_root>/presentation/<slug>_game.dart
+            roots[factory_key] = game_file.parent.parent
+    return roots
+
+
+def asset_url(key: str) -> str:
+    return f"{WEB_ASSET_URL_PREFIX}{key}"
+
+
+def file_revision(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def precache_entry(url: str, path: Path | None) -> dict[str, object]:
+    # Files without a known revision (compiled shell when no --build-dir is
+    # given) are served stale-while-revalidate by the worker.
+    revision = file_revision(path) if path is not None and path.is_file() else None
+    return {"url": url, "revision": revision}
+
+
+def list_shell_build_files(
+    project_root: Path,
+    build_dir: Path | None,
+    asset_urls: set[str],
+) -> list[tuple[str, Path | None]]:
+    """Return (url, path) pairs for the compiled shell."""
+    if build_dir is None:
+        names = list(SHELL_BUILD_FILES)
+        pubspec = (project_root / "pubspec.yaml").read_text(encoding="utf-8")
+        if re.search(r"^\s*uses-material-design:\s*true\s*$", pubspec, flags=re.MULTILINE):
+            names.append(MATERIAL_ICONS_BUILD_FILE)
+        return [(name, None) for name in names]
+
+    files: list[tuple[str, Path | None]] = []
+    for path in sorted(build_dir.rglob("*")):
+        url = path.relative_to(build_dir).as_posix()
+        if (
+            not path.is_file()
+            or url in asset_urls
+            or url in WORKER_BUILD_FILES
+            or url.startswith(RUNTIME_BUILD_PREFIXES)
+        ):
+            continue
+        files.append((url, path))
+    # index.html first: it is what a navigation resolves to.
+    return sorted(files, key=lambda item: item[0] != "index.html")
+
+
+def build_precache_manifest(project_root: Path, build_dir: Path | None = None) -> dict[str, object]:
+    factories_path = project_root / FACTORIES_RELATIVE_PATH
+    manifest_path = project_root / MANIFEST_RELATIVE_PATH
+    curriculum_path = project_root / CURRICULUM_RELATIVE_PATH
+    pubspec_path = project_root / "pubspec.yaml"
+    for path in (factories_path, manifest_path, curriculum_path, pubspec_path):
+        if not path.exists():
+            raise ValueError(f"Missing file: {path}")
+
+    games = [
+        entry
+        for entry in parse_game_manifest(manifest_path.read_text(encoding="utf-8"))
+        if entry.enabled
+    ]
+    curriculum = parse_curriculum_levels(curriculum_path.read_text(encoding="utf-8"))
+    declared = expand_declared_assets(
+        project_root,
+        parse_pubspec_assets(pubspec_path.read_text(encoding="utf-8")),
+    )
+
+    game_roots = parse_factory_game_roots(factories_path)
+    games_root = (project_root / GAMES_RELATIVE_PATH).resolve()
+    shell_sources = sorted(
+        path
+        for path in (project_root / "lib").rglob("*.dart")
+        if games_root not in path.parents
+    )
+    home_keys = collect_asset_references(project_root, shell_sources)
+    # The install tier blocks the trinn tier, so it only holds what the first
+    # frame draws. Other home assets (theme music) lead the background tier.
+    shell_keys = [key for key in home_keys if key.endswith(SHELL_ASSET_EXTENSIONS)]
+    shell_keys.extend(
+        key for key in declared if key.endswith((".ttf", ".otf")) and key not in shell_keys
+    )
+    deferred_home_keys = [key for key in home_keys if key not in shell_keys]
+
+    trinn_keys: dict[int, list[str]] = {trinn: [] for _, trinn in curriculum}
+    canvas_by_key: dict[str, tuple[float, float]] = {}
+    for entry in sorted(games, key=lambda game: (game.trinn, game.subject, game.level)):
+        level_count = curriculum.get((entry.subject, entry.trinn))
+        if level_count is None or entry.level >= level_count:
+            print(
+                f"warning: {entry.game_id} targets a slot missing from curriculum_data.dart",
+                file=sys.stderr,
+            )
+        game_root = game_roots.get(entry.factory_key)
+        if game_root is None:
+            print(
+                f"warning: no source folder found for {entry.game_id}",
+                file=sys.stderr,
+            )
+            continue
+        keys = trinn_keys.setdefault(entry.trinn, [])
+        canvas = parse_design_size(game_root)
+        for key in collect_asset_references(project_root, sorted(game_root.rglob("*.dart"))):
+            if canvas is not None:
+                canvas_by_key.setdefault(key, canvas)
+            if key not in shell_keys and key not in keys:
+                keys.append(key)
+
+    claimed = set(shell_keys).union(*trinn_keys.values())
+    background_keys = [key for key in deferred_home_keys if key not in claimed]
+    background_keys.extend(
+        key for key in declared if key not in claimed and key not in background_keys
+    )
+
+    all_keys = claimed.union(background_keys)
+    shell_files = list_shell_build_files(
+        project_root,
+        build_dir,
+        {asset_url(key) for key in all_keys},
+    )
+
+    def asset_entries(keys: list[str]) -> list[dict[str, object]]:
+        return [precache_entry(asset_url(key), project_root / key) for key in keys]
+
+    shell = [precache_entry(url, path) for url, path in shell_files] + asset_entries(shell_keys)
+    trinn = {str(trinn): asset_entries(keys) for trinn, keys in sorted(trinn_keys.items())}
+    background = asset_entries(background_keys)
+
+    # The worker precaches one resolution per image. It picks the smallest
+    # ratio covering the canvas scale (or devicePixelRatio without a canvas),
+    # the same rule as ParallaxBackground.variantRatio.
+    variants: dict[str, dict[str, object]] = {}
+    for key in sorted(all_keys):
+        variant_keys = resolution_variants(project_root, key)
+        if variant_ratio(key) != 1.0 or not variant_keys:
+            continue
+        canvas = canvas_by_key.get(key)
+        variants[asset_url(key)] = {
+            "canvas": {"width": canvas[0], "height": canvas[1]} if canvas else None,
+            "ratios": {
+                f"{variant_ratio(variant_key):.1f}": asset_url(variant_key)
+                for variant_key in [key, *variant_keys]
+            },
+        }
+
+    digest = hashlib.sha256()
+    for entry in shell + [item for items in trinn.values() for item in items] + background:
+        digest.update(f"{entry['url']}={entry['revision']}\n".encode("utf-8"))
+    return {
+        "version": digest.hexdigest()[:16],
+        "shell": shell,
+        "trinn": trinn,
+        "background": background,
+        "variants": variants,
+    }
+
+
+def render_precache_manifest(manifest: dict[str, object]) -> str:
+    return json.dumps(manifest, indent=2, ensure_ascii=False) + "\n"
+
+
+def resolve_project_root(arg: Path | None) -> Path:
+    if arg is not None:
+        return arg.resolve()
+    return Path(__file__).resolve().parents[1]
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        project_root = resolve_project_root(args.project_root)
+        build_dir = args.build_dir.resolve() if args.build_dir is not None else None
+        if build_dir is not None and not build_dir.is_dir():
+            raise ValueError(f"Missing build directory: {build_dir}")
+
+        content = render_precache_manifest(build_precache_manifest(project_root, build_dir))
+        # A build-specific version belongs to the build output, not the source tree.
+        if build_dir is not None:
+            output_path = build_dir / OUTPUT_RELATIVE_PATH.name
+        else:
+            output_path = project_root / OUTPUT_RELATIVE_PATH
+        display = output_path.relative_to(project_root).as_posix() if (
+            project_root in output_path.parents
+        ) else str(output_path)
+
+        if output_path.exists() and output_path.read_text(encoding="utf-8") == content:
+            print("No changes required.")
+            return 0
+        if args.dry_run:
+            print(f"[dry-run] would write {display}")
+            return 0
+        output_path.write_text(content, encoding="utf-8", newline="\n")
+        print(f"updated {display}")
+        return 0
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+{{flutter_js}}
+{{flutter_build_config}}
+
+// Registers precache_worker.js and asks it to fetch the games for the trinn
+// of the profiles stored on this device, at the image resolution this
+// viewport needs, before the rest of the assets.
+(function () {
+  if (!('serviceWorker' in navigator)) return;
+
+  function storedTrinns() {
+    try {
+      // shared_preferences stores values JSON-encoded under a `flutter.` prefix.
+      let profiles = JSON.parse(window.localStorage.getItem('flutter.profiles') || '[]');
+      if (typeof profiles === 'string') profiles = JSON.parse(profiles);
+      return [...new Set(profiles.map((profile) => profile.trinn))];
+    } catch (_) {
+      return [];
+    }
+  }
+
+  window.addEventListener('load', () => {
+    navigator.serviceWorker
+      .register('precache_worker.js')
+      .then(() => navigator.serviceWorker.ready)
+      .then((registration) => {
+        registration.active.postMessage({
+          type: 'precache',
+          trinn: storedTrinns(),
+          // The worker scales this to each game's canvas from the manifest.
+          viewport: {
+            width: window.innerWidth,
+            height: window.innerHeight,
+            devicePixelRatio: window.devicePixelRatio || 1,
+          },
+        });
+      })
+      .catch((error) => console.warn('Precache worker unavailable:', error));
+  });
+})();
+
+_flutter.loader.load();
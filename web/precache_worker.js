@@ -0,0 +1,262 @@
+// Prioritized precache service worker.
+//
+// Tiers come from precache_manifest.json, generated by
+// tool/build_web_precache.py: the shell is cached on install, then the
+// bootstrap asks for the active trinn's games, then everything else is
+// fetched in the background. The manifest itself is cached and revalidated
+// on each page load. Every entry carries its own revision, so a deploy only
+// re-downloads the files that changed.
+
+const PRECACHE = 'gradvis-precache';
+const MANIFEST_CACHE = 'gradvis-precache-manifest';
+const RUNTIME_CACHE = 'gradvis-runtime';
+const KNOWN_CACHES = [PRECACHE, MANIFEST_CACHE, RUNTIME_CACHE];
+const MANIFEST_URL = 'precache_manifest.json';
+
+let manifestPromise = null;
+let revalidation = null;
+const entryIndexes = new WeakMap();
+
+function resolve(path) {
+  return new URL(path, self.registration.scope).href;
+}
+
+// The revision is part of the cache key: a changed file is fetched again
+// while unchanged ones stay cached across deploys.
+function cacheKey(entry) {
+  const url = resolve(entry.url);
+  return entry.revision ? `${url}?__rev=${entry.revision}` : url;
+}
+
+function allEntries(manifest) {
+  return [
+    ...manifest.shell,
+    ...Object.values(manifest.trinn).flat(),
+    ...manifest.background,
+  ];
+}
+
+function entryFor(manifest, url) {
+  let index = entryIndexes.get(manifest);
+  if (!index) {
+    index = new Map(allEntries(manifest).map((entry) => [resolve(entry.url), entry]));
+    entryIndexes.set(manifest, index);
+  }
+  return index.get(url);
+}
+
+function fetchManifest() {
+  return fetch(MANIFEST_URL, { cache: 'no-cache' }).then((response) => {
+    if (!response.ok) throw new Error(`${MANIFEST_URL}: ${response.status}`);
+    return response.json();
+  });
+}
+
+async function cachedManifest() {
+  const cache = await caches.open(MANIFEST_CACHE);
+  const response = await cache.match(resolve(MANIFEST_URL));
+  return response ? response.json() : null;
+}
+
+async function precache(entries) {
+  const cache = await caches.open(PRECACHE);
+  for (const entry of entries) {
+    const key = cacheKey(entry);
+    if (await cache.match(key)) continue;
+    try {
+      // Bypass the HTTP cache so a new revision never stores old bytes.
+      const response = await fetch(resolve(entry.url), { cache: 'no-cache' });
+      if (response.status === 200) await cache.put(key, response);
+    } catch (_) {
+      // Offline or flaky network: the runtime fetch handler retries later.
+    }
+  }
+}
+
+// Removes cached files the manifest no longer lists at their current revision.
+async function prunePrecache(manifest) {
+  const cache = await caches.open(PRECACHE);
+  const keep = new Set(allEntries(manifest).map(cacheKey));
+  const requests = await cache.keys();
+  await Promise.all(
+    requests.filter((request) => !keep.has(request.url)).map((request) => cache.delete(request)),
+  );
+}
+
+// Drops caches from older worker versions.
+async function deleteUnknownCaches() {
+  const keys = await caches.keys();
+  await Promise.all(
+    keys
+      .filter((key) => key.startsWith('gradvis-') && !KNOWN_CACHES.includes(key))
+      .map((key) => caches.delete(key)),
+  );
+}
+
+// Caches the shell of [manifest], then makes it the version that is served.
+async function adoptManifest(manifest) {
+  await precache(manifest.shell);
+  const cache = await caches.open(MANIFEST_CACHE);
+  await cache.put(
+    resolve(MANIFEST_URL),
+    new Response(JSON.stringify(manifest), {
+      headers: { 'Content-Type': 'application/json' },
+    }),
+  );
+  manifestPromise = Promise.resolve(manifest);
+  return manifest;
+}
+
+// Serves the cached manifest so repeat visits work offline and without a
+// round trip; only a first run goes to the network.
+function loadManifest() {
+  if (manifestPromise === null) {
+    manifestPromise = cachedManifest()
+      .then((manifest) => manifest || fetchManifest().then(adoptManifest))
+      .catch((error) => {
+        manifestPromise = null;
+        throw error;
+      });
+  }
+  return manifestPromise;
+}
+
+// Asset-only deploys change the manifest but not this file, so no new worker
+// installs. Pick up a new version here instead.
+function revalidate() {
+  if (revalidation === null) {
+    revalidation = Promise.all([loadManifest(), fetchManifest()])
+      .then(async ([current, latest]) => {
+        if (latest.version === current.version) return current;
+        await adoptManifest(latest);
+        await prunePrecache(latest);
+        return latest;
+      })
+      .catch(() => loadManifest())
+      .finally(() => {
+        revalidation = null;
+      });
+  }
+  return revalidation;
+}
+
+const variantIndexes = new WeakMap();
+
+// Maps every resolution variant URL to its group in `manifest.variants`.
+function variantGroupFor(manifest, url) {
+  let index = variantIndexes.get(manifest);
+  if (!index) {
+    index = new Map();
+    for (const group of Object.values(manifest.variants || {})) {
+      for (const member of Object.values(group.ratios)) index.set(member, group);
+    }
+    variantIndexes.set(manifest, index);
+  }
+  return index.get(url);
+}
+
+// Same rule as ParallaxBackground.variantRatio: the smallest listed ratio
+// that covers the pixel ratio, else the largest one the build ships. A group
+// with a canvas is drawn letterboxed at that design size.
+function chosenVariant(group, viewport) {
+  const dpr = Number(viewport.devicePixelRatio) || 1;
+  const canvas = group.canvas;
+  const pixelRatio = canvas
+    ? Math.min(viewport.width / canvas.width, viewport.height / canvas.height) * dpr
+    : dpr;
+  const ratios = Object.keys(group.ratios).map(Number).sort((a, b) => a - b);
+  const ratio = ratios.find((candidate) => candidate >= pixelRatio) ?? ratios[ratios.length - 1];
+  return group.ratios[ratio.toFixed(1)];
+}
+
+// Keeps one resolution per image; other variants are cached on demand.
+function selectVariants(manifest, entries, viewport) {
+  return entries.filter((entry) => {
+    const group = variantGroupFor(manifest, entry.url);
+    return !group || chosenVariant(group, viewport) === entry.url;
+  });
+}
+
+function trinnEntries(manifest, trinns) {
+  return trinns.flatMap((trinn) => manifest.trinn[String(trinn)] || []);
+}
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    fetchManifest()
+      .then(adoptManifest)
+      .then(() => self.skipWaiting()),
+  );
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    loadManifest()
+      .then(prunePrecache)
+      .then(deleteUnknownCaches)
+      .then(() => self.clients.claim()),
+  );
+});
+
+// Sent by flutter_bootstrap.js on every page load.
+self.addEventListener('message', (event) => {
+  if (!event.data || event.data.type !== 'precache') return;
+  const trinns = Array.isArray(event.data.trinn) ? event.data.trinn : [];
+  const viewport = event.data.viewport || {};
+  event.waitUntil(revalidate().then(async (manifest) => {
+    const select = (entries) => selectVariants(manifest, entries, viewport);
+    await precache(select(trinnEntries(manifest, trinns)));
+    const others = Object.keys(manifest.trinn)
+      .filter((trinn) => !trinns.map(String).includes(trinn));
+    await precache(select(trinnEntries(manifest, others)));
+    await precache(select(manifest.background));
+  }));
+});
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+  event.respondWith(respond(request));
+});
+
+async function respond(request) {
+  let manifest;
+  try {
+    manifest = await loadManifest();
+  } catch (_) {
+    return fetch(request);
+  }
+  const url = request.mode === 'navigate' ? resolve('index.html') : request.url;
+  const entry = entryFor(manifest, url);
+
+  if (entry && entry.revision) {
+    const cache = await caches.open(PRECACHE);
+    const key = cacheKey(entry);
+    const cached = await cache.match(key);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.status === 200) cache.put(key, response.clone());
+    return response;
+  }
+
+  // Unrevisioned shell files, and build output the manifest leaves to the
+  // runtime cache (canvaskit/): serve from cache, refresh for the next visit.
+  if (entry) return staleWhileRevalidate(await caches.open(PRECACHE), cacheKey(entry), request);
+  if (!url.startsWith(self.registration.scope)) return fetch(request);
+  return staleWhileRevalidate(await caches.open(RUNTIME_CACHE), url, request);
+}
+
+async function staleWhileRevalidate(cache, key, request) {
+  const cached = await cache.match(key);
+  const refresh = fetch(request).then((response) => {
+    if (response.status === 200) cache.put(key, response.clone());
+    return response;
+  });
+  if (cached) {
+    refresh.catch(() => {});
+    return cached;
+  }
+  return refresh.catch(() => Response.error());
+}